@@ -0,0 +1,78 @@
+"""
+Benchmark for the Mario Expert decision loop, replayed from a recorded trace without the ROM.
+
+    python3 bench_choose_action.py -t ../results/your_upi/ram_trace.npz --repeats 5
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+
+from fake_pyboy import FakePyBoy
+from mario_expert import DecisionCache, MarioController, MarioExpert
+
+logging.basicConfig(level=logging.INFO)
+
+
+def get_args():
+    parse_args = argparse.ArgumentParser()
+
+    parse_args.add_argument("-t", "--trace", type=str, required=True)
+
+    parse_args.add_argument("-n", "--repeats", type=int, default=5)
+
+    parse_args.add_argument("--use_oam", action="store_true")
+
+    parse_args.add_argument("--decision_cache", action="store_true")
+
+    parse_args.add_argument("--verify_cache", action="store_true")
+
+    return parse_args.parse_args()
+
+
+def replay(trace, results_path, use_oam, decision_cache=None):
+    """
+    Runs choose_action on every frame of the trace and returns the time spent in it and the number of calls.
+    """
+    pyboy = FakePyBoy(trace)
+    environment = MarioController(pyboy=pyboy, use_oam=use_oam)
+    expert = MarioExpert.from_environment(results_path, environment)
+    expert.decision_cache = decision_cache
+
+    elapsed = 0.0
+    calls = 0
+    while pyboy.frame + 1 < len(pyboy):
+        start = time.perf_counter()
+        action = expert.choose_action()
+        elapsed += time.perf_counter() - start
+        calls += 1
+
+        environment.run_action(action, expert.jump_type)
+
+    return elapsed, calls
+
+
+def main():
+    args = get_args()
+
+    pyboy = FakePyBoy(args.trace)
+    logging.info(f"Loaded trace with {len(pyboy)} frames")
+
+    with tempfile.TemporaryDirectory() as results_path:
+        for i in range(args.repeats):
+            decision_cache = None
+            if args.decision_cache or args.verify_cache:
+                decision_cache = DecisionCache(verify=args.verify_cache)
+
+            elapsed, calls = replay(pyboy.trace, results_path, args.use_oam, decision_cache)
+            logging.info(
+                f"Run {i + 1}: {calls} calls, {1e6 * elapsed / max(calls, 1):.1f} us per choose_action"
+            )
+
+            if decision_cache is not None:
+                logging.info(f"Decision Cache: {decision_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
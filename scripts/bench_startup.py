@@ -0,0 +1,99 @@
+"""
+Startup benchmark for the Mario Expert agent.
+
+Spawns fresh interpreter processes that import the agent, build the environment headless and run a single
+step, then reports how long each phase took along with the total time-to-first-tick as seen by the parent.
+
+    python3 bench_startup.py --repeats 10
+"""
+
+import argparse
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+logging.basicConfig(level=logging.INFO)
+
+
+def get_args():
+    parse_args = argparse.ArgumentParser()
+
+    parse_args.add_argument("-n", "--repeats", type=int, default=5)
+
+    parse_args.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+
+    return parse_args.parse_args()
+
+
+def child():
+    start = time.perf_counter()
+
+    from mario_expert import MarioExpert
+
+    imported = time.perf_counter()
+
+    with tempfile.TemporaryDirectory() as results_path:
+        expert = MarioExpert(results_path=results_path, headless=True)
+        expert.record_video = False
+        expert.environment.reset()
+
+        constructed = time.perf_counter()
+
+        expert.step()
+
+        ticked = time.perf_counter()
+
+    timings = {
+        "import": imported - start,
+        "construct": constructed - imported,
+        "first_tick": ticked - constructed,
+        "cv2_loaded": "cv2" in sys.modules,
+        "pygame_loaded": "pygame" in sys.modules,
+    }
+    print(json.dumps(timings))
+
+
+def main():
+    args = get_args()
+
+    if args.child:
+        child()
+        return
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    runs = []
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, __file__, "--child"],
+            cwd=script_dir,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        total = time.perf_counter() - start
+
+        timings = json.loads(output.strip().splitlines()[-1])
+        timings["total"] = total
+        runs.append(timings)
+
+    for phase in ["import", "construct", "first_tick", "total"]:
+        values = [run[phase] for run in runs]
+        logging.info(
+            f"{phase:>10}: mean {1000 * sum(values) / len(values):8.1f} ms  min {1000 * min(values):8.1f} ms"
+        )
+
+    # ru_maxrss is reported in KiB on Linux
+    max_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    logging.info(f"Peak child RSS: {max_rss / 1024:.1f} MiB")
+    logging.info(f"cv2 loaded: {runs[-1]['cv2_loaded']} pygame loaded: {runs[-1]['pygame_loaded']}")
+
+
+if __name__ == "__main__":
+    main()
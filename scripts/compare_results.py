@@ -4,6 +4,8 @@ import json
 import logging
 from functools import cmp_to_key
 
+from summary_store import load_summary, rank
+
 logging.basicConfig(level=logging.INFO)
 
 
@@ -29,14 +31,37 @@ def compare_performance(results_one, results_two):
 def get_args():
     parse_args = argparse.ArgumentParser()
 
-    parse_args.add_argument("-r", "--results_path", type=str, required=True)
+    parse_args.add_argument("-r", "--results_path", type=str)
+
+    parse_args.add_argument("-s", "--summary_path", type=str)
 
     return parse_args.parse_args()
 
 
+def compare_summary(summary_path):
+    logging.info(f"Comparing summarised results in {summary_path}")
+
+    summary = load_summary(summary_path)
+    if not summary:
+        logging.info("No summary shards found")
+        return
+
+    for i, row in enumerate(rank(summary)):
+        logging.info(
+            f"Rank {i + 1}: {summary['upi'][row]} - World: {summary['world'][row]} Stage: {summary['stage'][row]} Score: {summary['score'][row]}"
+        )
+
+
 def main():
     args = get_args()
 
+    if args.summary_path is not None:
+        compare_summary(args.summary_path)
+        return
+
+    if args.results_path is None:
+        raise ValueError("Either --results_path or --summary_path is required")
+
     results_path = args.results_path
 
     result_directories = glob.glob(f"{results_path}/*")
@@ -0,0 +1,225 @@
+"""
+Deterministic, ROM-free stand-in for PyBoy.
+
+TraceRecorder wraps a real PyBoy instance and captures the RAM regions, game area, scroll position and score the
+environment reads after every tick. FakePyBoy plays such a trace back through the slice of the PyBoy API used by
+PyboyEnvironment, MarioEnvironment and MarioController, so the expert can be tested and benchmarked without the ROM.
+
+Playback is open loop - inputs sent to FakePyBoy are logged but do not change the recorded frames.
+
+    python3 run.py --upi your_upi --headless --record_trace   # writes results/your_upi/ram_trace.npz
+
+    pyboy = FakePyBoy("ram_trace.npz")
+    environment = MarioController(pyboy=pyboy)
+"""
+
+import numpy as np
+
+# Memory regions captured per frame: background tilemap (time/world/stage), work RAM, OAM and high RAM
+REGIONS = [(0x9800, 0x9C00), (0xC000, 0xE000), (0xFE00, 0xFEA0), (0xFF80, 0xFFFF)]
+
+SCREEN_SHAPE = (144, 160, 4)
+GAME_AREA_SHAPE = (16, 20)
+
+
+def capture(pyboy):
+    """
+    Returns a snapshot of everything the environment reads from pyboy for the current frame.
+    """
+    game_wrapper = pyboy.game_wrapper
+    game_wrapper.game_area_mapping(game_wrapper.mapping_compressed, 0)
+
+    return {
+        "ram": np.concatenate(
+            [np.asarray(pyboy.memory[start:end], dtype=np.uint8) for start, end in REGIONS]
+        ),
+        "game_area": np.asarray(game_wrapper.game_area(), dtype=np.uint32),
+        "scx": pyboy.screen.tilemap_position_list[16][0],
+        "score": game_wrapper.score,
+    }
+
+
+def blank_trace(frames: int) -> dict:
+    """
+    Returns an all-zero trace of the given length, for building synthetic traces with poke.
+    """
+    columns = sum(end - start for start, end in REGIONS)
+    return {
+        "regions": np.asarray(REGIONS, dtype=np.int32),
+        "ram": np.zeros((frames, columns), dtype=np.uint8),
+        "game_area": np.zeros((frames,) + GAME_AREA_SHAPE, dtype=np.uint32),
+        "scx": np.zeros(frames, dtype=np.int32),
+        "score": np.zeros(frames, dtype=np.int32),
+        "input_frames": np.zeros(0, dtype=np.int32),
+        "input_events": np.zeros(0, dtype=np.int32),
+    }
+
+
+def poke(trace, addr: int, values, frames=slice(None)) -> None:
+    """
+    Writes values (a byte or a sequence of bytes starting at addr) into the recorded RAM of trace.
+    """
+    values = np.atleast_1d(np.asarray(values, dtype=np.uint8))
+
+    column = 0
+    for start, end in trace["regions"]:
+        if start <= addr and addr + len(values) <= end:
+            column += addr - start
+            trace["ram"][frames, column : column + len(values)] = values
+            return
+        column += end - start
+
+    raise ValueError(f"Address {addr:#06x} is not in a recorded region")
+
+
+class TraceRecorder:
+    """
+    Transparent wrapper around a real PyBoy instance that records a trace for FakePyBoy.
+
+    Loading a state starts a new trace, so the trace saved at the end of MarioExpert.play covers the whole run.
+    """
+
+    def __init__(self, pyboy) -> None:
+        self._pyboy = pyboy
+        self.frames = []
+        self.inputs = []
+
+    def __getattr__(self, name):
+        return getattr(self._pyboy, name)
+
+    def load_state(self, file) -> None:
+        self._pyboy.load_state(file)
+        self.frames = [capture(self._pyboy)]
+        self.inputs = []
+
+    def send_input(self, event) -> None:
+        self.inputs.append((len(self.frames) - 1, int(event)))
+        self._pyboy.send_input(event)
+
+    def tick(self, count: int = 1, render: bool = True) -> bool:
+        """
+        Ticks the emulator count frames one at a time, capturing each so the trace keeps one entry per frame.
+        """
+        for _ in range(count):
+            running = self._pyboy.tick(1, render)
+            self.frames.append(capture(self._pyboy))
+            if not running:
+                return False
+
+        return True
+
+    def save(self, path: str) -> None:
+        inputs = np.asarray(self.inputs, dtype=np.int32).reshape(-1, 2)
+        np.savez_compressed(
+            path,
+            regions=np.asarray(REGIONS, dtype=np.int32),
+            ram=np.stack([frame["ram"] for frame in self.frames]),
+            game_area=np.stack([frame["game_area"] for frame in self.frames]),
+            scx=np.asarray([frame["scx"] for frame in self.frames], dtype=np.int32),
+            score=np.asarray([frame["score"] for frame in self.frames], dtype=np.int32),
+            input_frames=inputs[:, 0],
+            input_events=inputs[:, 1],
+        )
+
+
+class FakeMemory:
+    """
+    Read-only view of the current trace frame, indexed like pyboy.memory. Unrecorded addresses read as 0.
+    """
+
+    def __init__(self, pyboy) -> None:
+        self._pyboy = pyboy
+
+        self._columns = np.full(0x10000, -1, dtype=np.int32)
+        column = 0
+        for start, end in pyboy.trace["regions"]:
+            self._columns[start:end] = np.arange(column, column + end - start)
+            column += end - start
+
+    def __getitem__(self, addr):
+        ram = self._pyboy.trace["ram"][self._pyboy.frame]
+
+        if isinstance(addr, slice):
+            columns = self._columns[addr]
+            return np.where(columns >= 0, ram[columns], 0).tolist()
+
+        column = self._columns[addr]
+        return int(ram[column]) if column >= 0 else 0
+
+
+class FakeScreen:
+    def __init__(self, pyboy) -> None:
+        self._pyboy = pyboy
+        self.ndarray = np.zeros(SCREEN_SHAPE, dtype=np.uint8)
+
+    @property
+    def tilemap_position_list(self):
+        return [[int(self._pyboy.trace["scx"][self._pyboy.frame]), 0]] * SCREEN_SHAPE[0]
+
+
+class FakeGameWrapper:
+    mapping_compressed = None
+
+    def __init__(self, pyboy) -> None:
+        self._pyboy = pyboy
+
+    def game_area_mapping(self, mapping, sprite_offset=0) -> None:
+        # The trace is captured with the compressed mapping MarioEnvironment uses
+        pass
+
+    def game_area(self) -> np.ndarray:
+        return self._pyboy.trace["game_area"][self._pyboy.frame]
+
+    @property
+    def score(self) -> int:
+        return int(self._pyboy.trace["score"][self._pyboy.frame])
+
+
+class FakePyBoy:
+    """
+    Plays back a trace recorded by TraceRecorder through the parts of the PyBoy API the environment uses.
+
+    Args:
+        trace (str | dict): Path to a saved trace, or the already loaded arrays.
+    """
+
+    def __init__(self, trace) -> None:
+        if isinstance(trace, str):
+            with np.load(trace) as data:
+                trace = {name: data[name] for name in data.files}
+
+        self.trace = trace
+        self.frame = 0
+        self.inputs = []
+
+        self.memory = FakeMemory(self)
+        self.screen = FakeScreen(self)
+        self.game_wrapper = FakeGameWrapper(self)
+
+    def __len__(self) -> int:
+        return len(self.trace["ram"])
+
+    def set_emulation_speed(self, speed: int) -> None:
+        pass
+
+    def send_input(self, event) -> None:
+        self.inputs.append((self.frame, int(event)))
+
+    def tick(self, count: int = 1, render: bool = True) -> bool:
+        """
+        Advances the trace by count frames. If fewer than count remain it stops on the last frame and returns False.
+        """
+        target = self.frame + count
+        self.frame = min(target, len(self) - 1)
+        return self.frame == target
+
+    def save_state(self, file) -> None:
+        file.write(int(self.frame).to_bytes(8, "little"))
+
+    def load_state(self, file) -> None:
+        """
+        Restores a state written by save_state. Anything else, such as a real PyBoy state, rewinds to the start.
+        """
+        state = file.read()
+        self.frame = int.from_bytes(state, "little") if len(state) == 8 else 0
+        self.inputs = []
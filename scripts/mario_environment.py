@@ -24,6 +24,7 @@ class MarioEnvironment(PyboyEnvironment):
         act_freq: int = 10,
         emulation_speed: int = 0,
         headless: bool = False,
+        pyboy=None,
     ) -> None:
 
         super().__init__(
@@ -32,6 +33,7 @@ class MarioEnvironment(PyboyEnvironment):
             init_name="init.state",
             emulation_speed=emulation_speed,
             headless=headless,
+            pyboy=pyboy,
         )
 
         self.act_freq = act_freq
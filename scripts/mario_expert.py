@@ -6,17 +6,20 @@ Your goal is to implement the functions and methods required to enable choose_ac
 Original Mario Manual: https://www.thegameisafootarcade.com/wp-content/uploads/2017/04/Super-Mario-Land-Game-Manual.pdf
 """
 
+import glob
+import io
 import json
 import logging
+import os
 import random
 import numpy as np
-import pygame
 
-import cv2
 from mario_environment import MarioEnvironment
 from pyboy.utils import WindowEvent
 
+from collections import OrderedDict
 from enum import Enum
+from typing import NamedTuple
 
 class JumpType(Enum):
     ENEMY = 'ENEMY'
@@ -25,6 +28,120 @@ class JumpType(Enum):
     NONE = 'NONE'
 
 
+class Rect(NamedTuple):
+    """
+    Minimal stand-in for pygame.Rect - only collidepoint is needed, and pulling in pygame for it slows startup.
+    """
+
+    x: int
+    y: int
+    w: int
+    h: int
+
+    def collidepoint(self, x, y):
+        return self.x <= x < self.x + self.w and self.y <= y < self.y + self.h
+
+
+# Enemy offsets (relative to Mario, y up) that make choose_action jump - ENEMY_RECT contains ENEMY_ABOVE_RECT
+ENEMY_RECT = Rect(-13, -57, 50, 120)
+ENEMY_ABOVE_RECT = Rect(-13, -20, 50, 30)
+
+
+# OAM tile IDs by sprite family, taken from PyBoy's Super Mario Land game wrapper. Sprites only join an entity
+# with sprites of the same family. Family 0 is anything unlisted - coins, power-ups and Mario's superball
+MARIO_TILES = list(range(81)) + list(range(99, 110)) + list(range(112, 122))  # Mario, plane and submarine
+ENEMY_TILE_FAMILIES = [
+    [144],  # Goomba
+    [150, 151, 152, 153],  # Koopa
+    [146, 147, 148, 149],  # Plant
+    [160, 161, 162, 163, 176, 177, 178, 179],  # Moth
+    [192, 193, 194, 195, 208, 209, 210, 211],  # Flying moth
+    [164, 165, 166, 167, 180, 181, 182, 183],  # Sphinx
+    [198, 199, 201, 202, 203, 204, 205, 214, 215, 217, 218, 219],  # Big sphinx
+    [240, 241, 242, 243],  # Fist
+    [249],  # Bill
+    [172, 188, 196, 197, 212, 213, 226, 227],  # Projectiles
+    [154, 155],  # Shell
+    [157, 158],  # Explosion
+    [237],  # Spike
+]
+
+MARIO_FAMILY = -1
+SPRITE_FAMILY = np.zeros(256, dtype=np.int16)
+SPRITE_FAMILY[MARIO_TILES] = MARIO_FAMILY
+for family, tiles in enumerate(ENEMY_TILE_FAMILIES, start=1):
+    SPRITE_FAMILY[tiles] = family
+
+
+class DecisionCache:
+    """
+    Bounded LRU cache of MarioExpert decisions keyed on the quantized local observation around Mario.
+
+    The key covers everything the predicate chain in MarioExpert.decide reads: the game_area columns it inspects,
+    the enemy offsets that fall inside ENEMY_RECT (bucketed to bucket pixels), Mario's ground/falling flags, his
+    speed and the current jump state. With bucket=1 a hit is exact; larger buckets trade accuracy for hit rate.
+
+    Args:
+        maxsize (int): The maximum number of decisions kept before the least recently used is evicted. Defaults to 4096.
+        bucket (int): The size in pixels of the enemy offset buckets. Defaults to 1.
+        verify (bool): Whether to re-evaluate every hit and count mismatches instead of trusting the cache. Defaults to False.
+    """
+
+    # game_area columns read by is_element_near, get_wall_height and danger_of_gap
+    COLUMNS = slice(5, 15)
+
+    def __init__(self, maxsize: int = 4096, bucket: int = 1, verify: bool = False) -> None:
+        self.maxsize = maxsize
+        self.bucket = bucket
+        self.verify = verify
+
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.mismatches = 0
+
+    def key(self, game_area, enemy_offsets, on_ground, falling, mario_speed, jump_type, jump_count, jump_size):
+        enemies = tuple(
+            sorted(
+                (dx // self.bucket, dy // self.bucket)
+                for dx, dy in enemy_offsets
+                if ENEMY_RECT.collidepoint(dx, dy)
+            )
+        )
+        area = np.ascontiguousarray(game_area[:, self.COLUMNS]).tobytes()
+        return (area, enemies, on_ground, falling, mario_speed, jump_type, jump_count, jump_size)
+
+    def get(self, key):
+        decision = self.entries.get(key)
+        if decision is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return decision
+
+    def put(self, key, decision) -> None:
+        self.entries[key] = decision
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict[str, any]:
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "mismatches": self.mismatches,
+        }
+
+
 class MarioController(MarioEnvironment):
     """
     The MarioController class represents a controller for the Mario game environment.
@@ -35,21 +152,38 @@ class MarioController(MarioEnvironment):
         act_freq (int): The frequency at which actions are performed. Defaults to 10.
         emulation_speed (int): The speed of the game emulation. Defaults to 0.
         headless (bool): Whether to run the game in headless mode. Defaults to False.
+        use_oam (bool): Whether to detect enemies from the OAM sprite table instead of the object table. Defaults to False.
+        pyboy (PyBoy, optional): An already constructed emulator backend to use instead of loading the ROM. Defaults to None.
     """
 
+    # Sprite attribute table - 40 sprites of 4 bytes each: y, x, tile, flags
+    OAM_START = 0xFE00
+    OAM_END = 0xFEA0
+    # Sprites closer than this (in pixels, on both axes) are treated as parts of the same entity
+    ENTITY_LINK_DISTANCE = 8
+    # find_mario minus get_mario_oam_anchor, used to move entities into find_mario space on frames where Mario's
+    # sprites are not drawn (e.g. while blinking). Checked against the recorded fixture in tests/test_oam_entities.py
+    MARIO_OAM_OFFSET = (0, 0)
+
     def __init__(
         self,
         act_freq: int = 1,
         emulation_speed: int = 0,
         headless: bool = False,
+        use_oam: bool = False,
+        pyboy=None,
     ) -> None:
         super().__init__(
             act_freq=act_freq,
             emulation_speed=emulation_speed,
             headless=headless,
+            pyboy=pyboy,
         )
 
         self.act_freq = act_freq
+        self.use_oam = use_oam
+        # Cleared once the emulator stops ticking - a closed window or the end of a FakePyBoy trace
+        self.running = True
 
         # Example of valid actions based purely on the buttons you can press
         valid_actions: list[WindowEvent] = [
@@ -87,7 +221,8 @@ class MarioController(MarioEnvironment):
         self.pyboy.send_input(self.valid_actions[action])
 
         for _ in range(self.act_freq):
-            self.pyboy.tick()
+            if not self.pyboy.tick():
+                self.running = False
 
         self.pyboy.send_input(self.release_button[action])
         
@@ -143,7 +278,130 @@ class MarioController(MarioEnvironment):
 
         return positions
 
+    def _read_block(self, start: int, end: int) -> np.ndarray:
+        return np.asarray(self.pyboy.memory[start:end], dtype=np.uint8)
+
+    def get_oam_sprites(self) -> np.ndarray:
+        """
+        Reads the whole OAM table in one slice and returns the visible sprites as an (N, 4) array of [y, x, tile, flags].
+
+        Positions are raw OAM coordinates, offset by (8, 16) from the top left of the screen, so a sprite with
+        y == 0 or y >= 160 (or x == 0 or x >= 168) is hidden. get_entities converts them into find_mario space.
+        """
+        oam = self._read_block(self.OAM_START, self.OAM_END).reshape(40, 4)
+        visible = (oam[:, 0] > 0) & (oam[:, 0] < 160) & (oam[:, 1] > 0) & (oam[:, 1] < 168)
+        return oam[visible]
+
+    def get_mario_oam_anchor(self, sprites=None):
+        """
+        Returns the raw OAM (x, y) of the top left of Mario's lowest row of sprites, or None if none are drawn.
+
+        The lowest row is used so the anchor stays at Mario's feet whether he is small or big.
+        """
+        if sprites is None:
+            sprites = self.get_oam_sprites().astype(np.int16)
+
+        mario = sprites[SPRITE_FAMILY[sprites[:, 2]] == MARIO_FAMILY]
+        if len(mario) == 0:
+            return None
+
+        return int(mario[:, 1].min()), int(mario[:, 0].max())
+
+    def get_entities(self, include_mario: bool = False, enemies_only: bool = False) -> np.ndarray:
+        """
+        Groups the visible OAM sprites into entities and returns an (N, 4) array of [x, y, tile, family].
+
+        Each sprite's family comes from its tile ID (see SPRITE_FAMILY). Mario's sprites are taken out first unless
+        include_mario is set, and enemies_only keeps only enemy families. The remaining sprites are linked when they
+        share a family and are within ENTITY_LINK_DISTANCE of each other, and grouped into connected components.
+        Each entity is reported at the top left corner of its sprites together with its lowest tile ID.
+
+        Positions are in the same space as find_mario: Mario's own sprites are used as the reference point, so an
+        entity's offset from find_mario is its pixel offset from Mario on screen. MARIO_OAM_OFFSET is used instead
+        when Mario's sprites are not drawn.
+        """
+        sprites = self.get_oam_sprites().astype(np.int16)
+        family = SPRITE_FAMILY[sprites[:, 2]]
+
+        anchor = self.get_mario_oam_anchor(sprites)
+        if anchor is None:
+            shift_x, shift_y = self.MARIO_OAM_OFFSET
+        else:
+            mario_x, mario_y = self.find_mario()
+            shift_x, shift_y = mario_x - anchor[0], mario_y - anchor[1]
+
+        keep = np.ones(len(sprites), dtype=bool)
+        if not include_mario:
+            keep &= family != MARIO_FAMILY
+        if enemies_only:
+            keep &= family > 0
+        sprites, family = sprites[keep], family[keep]
+
+        if len(sprites) == 0:
+            return np.empty((0, 4), dtype=np.int16)
+
+        y, x, tile = sprites[:, 0], sprites[:, 1], sprites[:, 2]
+
+        adjacent = (
+            (family[:, None] == family[None, :])
+            & (np.abs(x[:, None] - x[None, :]) <= self.ENTITY_LINK_DISTANCE)
+            & (np.abs(y[:, None] - y[None, :]) <= self.ENTITY_LINK_DISTANCE)
+        )
+
+        # Propagate the lowest sprite index through each connected component
+        labels = np.arange(len(sprites))
+        while True:
+            spread = np.where(adjacent, labels[None, :], len(sprites)).min(axis=1)
+            if np.array_equal(spread, labels):
+                break
+            labels = spread
+
+        order = np.argsort(labels, kind="stable")
+        labels = labels[order]
+        starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+
+        return np.stack(
+            [
+                np.minimum.reduceat(x[order], starts) + shift_x,
+                np.minimum.reduceat(y[order], starts) + shift_y,
+                np.minimum.reduceat(tile[order], starts),
+                family[order][starts],
+            ],
+            axis=1,
+        )
+
+    def is_entity_near(self, rect):
+        entities = self.get_entities(enemies_only=True)
+        if len(entities) == 0:
+            return False
+
+        mario_x, mario_y = self.find_mario()
+        dx = entities[:, 0] - mario_x
+        dy = mario_y - entities[:, 1]
+
+        inside = (dx >= rect.x) & (dx < rect.x + rect.w) & (dy >= rect.y) & (dy < rect.y + rect.h)
+        return bool(inside.any())
+
+    def get_enemy_offsets(self):
+        """
+        Returns the (dx, dy) offset of every enemy from Mario, with y pointing up - the space is_enemy_near tests.
+        """
+        mario_x, mario_y = self.find_mario()
+
+        if self.use_oam:
+            return [(int(x) - mario_x, mario_y - int(y)) for x, y, _, _ in self.get_entities(enemies_only=True)]
+
+        offsets = []
+        for obj_type in [0x00, 0x04, 0x42]:  # Goomba, Nokobon, Bee
+            for (enemy_x, enemy_y) in self.get_enemy_positions(obj_type):
+                offsets.append((enemy_x - mario_x, mario_y - enemy_y))
+
+        return offsets
+
     def is_enemy_near(self, rect):
+        if self.use_oam:
+            return self.is_entity_near(rect)
+
         enemy_types = [0x00, 0x04, 0x42]  # Goomba, Nokobon, Bee
         mario_x, mario_y = self.find_mario()
 
@@ -214,9 +472,33 @@ class MarioExpert:
     """
 
     def __init__(self, results_path: str, headless=False):
+        self.setup(results_path, MarioController(headless=headless))
+
+    @classmethod
+    def from_environment(cls, results_path: str, environment: MarioController):
+        """
+        Builds an expert around an existing controller - e.g. one backed by fake_pyboy.FakePyBoy for testing.
+        """
+        expert = cls.__new__(cls)
+        expert.setup(results_path, environment)
+        return expert
+
+    def setup(self, results_path: str, environment: MarioController):
         self.results_path = results_path
-        self.environment = MarioController(headless=headless)
+        self.environment = environment
         self.video = None
+        # Set to False to skip video recording entirely - cv2 is then never imported
+        self.record_video = True
+        # Save a checkpoint every N frames so an interrupted run can be resumed - 0 disables checkpointing
+        self.checkpoint_every = 0
+        self.frame = 0
+        self.segment = 0
+        # Per-frame (x_position, score) samples, saved to trace.npz for summarise_results.py
+        self.trace = []
+        # Number of trace samples already appended to trace_path by earlier checkpoints
+        self.trace_flushed = 0
+        # Optional DecisionCache - None evaluates the full predicate chain every frame
+        self.decision_cache = None
         self.prev_pos = 0
         self.jump_type = JumpType.NONE
         self.jump_count = 0
@@ -226,51 +508,77 @@ class MarioExpert:
         self.action[4] = True
         self.stuck = 0
 
-    def set_jump(self, jump_type, size):
-        self.jump_type = jump_type
-        self.jump_size = size
-        self.jump_count = 0
-
-        # Print the new jump type
-        # print(f"Jump Type Set To: {self.jump_type}")
-
     def choose_action(self):
-            mario_positions = self.environment.find_mario()
-            x_pos = self.environment.game_state()["x_position"]
+            x_pos = self.environment.get_x_position()
             mario_speed = x_pos - self.prev_pos
+            self.prev_pos = x_pos
 
-            enemy_positions = self.environment.get_goomba_positions()
             game_area = self.environment.game_area()
+            on_ground = self.environment.is_mario_on_ground()
+            falling = self.environment.mario_falling()
+
+            if self.decision_cache is None:
+                decision = self.decide(game_area, mario_speed, on_ground, falling)
+            else:
+                key = self.decision_cache.key(
+                    game_area,
+                    self.environment.get_enemy_offsets(),
+                    on_ground,
+                    falling,
+                    mario_speed,
+                    self.jump_type,
+                    self.jump_count,
+                    self.jump_size,
+                )
+                decision = self.decision_cache.get(key)
+
+                if decision is None or self.decision_cache.verify:
+                    fresh = self.decide(game_area, mario_speed, on_ground, falling)
+                    if decision is not None and decision != fresh:
+                        self.decision_cache.mismatches += 1
+                        logging.warning(f"Decision cache mismatch: cached {decision} fresh {fresh}")
+                    decision = fresh
+                    self.decision_cache.put(key, decision)
+
+            action_index, self.jump_type, self.jump_size, self.jump_count = decision
+            return action_index
+
+    def decide(self, game_area, mario_speed, on_ground, falling):
+            """
+            Runs the predicate chain for the current frame without changing the expert's state.
 
-            danger_of_enemy = self.environment.is_enemy_near(pygame.Rect(-13, -57, 50, 120)) or self.environment.is_element_near(game_area)
-            danger_of_enemy_above = self.environment.is_enemy_near(pygame.Rect(-13, -20, 50, 30))
+            Returns the action index along with the jump type, size and count to carry into the next frame.
+            """
+            danger_of_enemy = self.environment.is_enemy_near(ENEMY_RECT) or self.environment.is_element_near(game_area)
+            danger_of_enemy_above = self.environment.is_enemy_near(ENEMY_ABOVE_RECT)
             danger_of_gap = self.environment.danger_of_gap(game_area)
 
             #print(danger_of_enemy, danger_of_gap, mario_speed)
 
-            if self.environment.is_mario_on_ground() and self.jump_type != JumpType.NONE:
-                self.set_jump(JumpType.NONE, -1)
-            elif self.environment.may_mario_jump():
+            jump_type, jump_size, jump_count = self.jump_type, self.jump_size, self.jump_count
+
+            if on_ground and jump_type != JumpType.NONE:
+                jump_type, jump_size, jump_count = JumpType.NONE, -1, 0
+            elif on_ground:
                 wall_height = self.environment.get_wall_height(game_area)
                 if danger_of_gap : #and mario_speed > 0:
-                    self.set_jump(JumpType.GAP, 20 - mario_speed)
+                    jump_type, jump_size, jump_count = JumpType.GAP, 20 - mario_speed, 0
                 elif mario_speed <= 0 and not danger_of_enemy_above and wall_height > 0:
-                    self.set_jump(JumpType.WALL, wall_height + 7 if wall_height >= 2 else wall_height)
+                    jump_type, jump_size, jump_count = JumpType.WALL, wall_height + 7 if wall_height >= 2 else wall_height, 0
                 elif danger_of_enemy:
-                    self.set_jump(JumpType.ENEMY, 15)
+                    jump_type, jump_size, jump_count = JumpType.ENEMY, 15, 0
 
             else:
-                self.jump_count += 1
+                jump_count += 1
 
             action_index = self.environment.valid_actions.index(WindowEvent.PRESS_ARROW_RIGHT)
-            if self.environment.mario_falling() and ((danger_of_enemy and danger_of_enemy_above) or danger_of_gap): 
+            if falling and ((danger_of_enemy and danger_of_enemy_above) or danger_of_gap): 
                 action_index = self.environment.valid_actions.index(WindowEvent.PRESS_ARROW_LEFT)
-            elif self.jump_type != JumpType.NONE and self.jump_count < self.jump_size: action_index = self.environment.valid_actions.index(WindowEvent.PRESS_BUTTON_A)
-            elif not(self.environment.mario_falling()) and not((danger_of_enemy_above and self.jump_type == JumpType.WALL)): 
+            elif jump_type != JumpType.NONE and jump_count < jump_size: action_index = self.environment.valid_actions.index(WindowEvent.PRESS_BUTTON_A)
+            elif not(falling) and not((danger_of_enemy_above and jump_type == JumpType.WALL)): 
                 action_index = self.environment.valid_actions.index(WindowEvent.PRESS_ARROW_RIGHT)
-                
-            self.prev_pos = x_pos
-            return action_index
+
+            return action_index, jump_type, jump_size, jump_count
 
 
     def step(self):
@@ -286,41 +594,183 @@ class MarioExpert:
         # Run the action on the environment
         self.environment.run_action(action, self.jump_type)
 
-    def play(self):
+    def play(self, resume=False):
         """
-        Do NOT edit this method.
+        Plays the level until game over and writes results.json (plus the video and trace) into results_path.
+
+        If resume is set and a checkpoint exists in results_path the run continues from it. Otherwise it starts
+        from the beginning of the level and any checkpoint or video segments left by an earlier run are removed.
+        When checkpointing is enabled the video is split into one segment per checkpoint so every segment before
+        an interruption is a complete, readable file.
         """
-        self.environment.reset()
+        if resume and os.path.exists(self.checkpoint_path()):
+            self.load_checkpoint()
+            logging.info(f"Resuming from frame {self.frame} (video segment {self.segment})")
+        else:
+            self.clear_checkpoint()
+            self.frame = 0
+            self.segment = 0
+            self.trace = []
+            self.trace_flushed = 0
+            self.environment.reset()
+
+        if self.record_video:
+            self.start_segment()
+
+        self.environment.running = True
+        while self.environment.running and not self.environment.get_game_over():
+            if self.record_video:
+                frame = self.environment.grab_frame()
+                self.video.write(frame)
 
-        frame = self.environment.grab_frame()
-        height, width, _ = frame.shape
+            self.step()
+            self.frame += 1
+            self.trace.append((self.environment.get_x_position(), self.environment.get_score()))
 
-        self.start_video(f"{self.results_path}/mario_expert.mp4", width, height)
+            if self.checkpoint_every > 0 and self.frame % self.checkpoint_every == 0:
+                self.stop_video()
+                self.segment += 1
+                self.save_checkpoint()
 
-        while not self.environment.get_game_over():
-            frame = self.environment.grab_frame()
-            self.video.write(frame)
+                if self.record_video:
+                    self.start_segment()
 
-            self.step()
+        if not self.environment.running:
+            logging.warning("Emulator stopped before game over")
 
         final_stats = self.environment.game_state()
         logging.info(f"Final Stats: {final_stats}")
 
+        if self.decision_cache is not None:
+            logging.info(f"Decision Cache: {self.decision_cache.stats()}")
+
         with open(f"{self.results_path}/results.json", "w", encoding="utf-8") as file:
             json.dump(final_stats, file)
 
+        self.save_trace()
+
         self.stop_video()
 
+        self.remove_checkpoint()
+
+    def checkpoint_path(self):
+        return f"{self.results_path}/checkpoint.state"
+
+    def remove_checkpoint(self):
+        for path in [self.checkpoint_path(), f"{self.checkpoint_path()}.tmp", self.trace_path()]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def clear_checkpoint(self):
+        """
+        Removes the checkpoint and extra video segments of a previous run so they cannot be mixed into this one.
+        """
+        self.remove_checkpoint()
+
+        for path in glob.glob(f"{self.results_path}/mario_expert_*.mp4"):
+            os.remove(path)
+
+    def save_checkpoint(self):
+        """
+        Writes the emulator state and the expert's internal state to checkpoint_path.
+
+        The file is a single JSON header line followed by the raw PyBoy save state. It is written to a temporary
+        file first and moved into place with os.replace so a kill mid-write never leaves a corrupt checkpoint.
+        Trace samples are appended to trace_path instead, so each checkpoint only writes what is new.
+        """
+        self.flush_trace()
+
+        state = io.BytesIO()
+        self.environment.pyboy.save_state(state)
+
+        header = {
+            "frame": self.frame,
+            "segment": self.segment,
+            "prev_pos": self.prev_pos,
+            "jump_type": self.jump_type.value,
+            "jump_count": self.jump_count,
+            "jump_size": self.jump_size,
+            "trace_length": self.trace_flushed,
+        }
+
+        path = self.checkpoint_path()
+        with open(f"{path}.tmp", "wb") as file:
+            file.write(json.dumps(header).encode("utf-8") + b"\n")
+            file.write(state.getvalue())
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(f"{path}.tmp", path)
+
+    def load_checkpoint(self):
+        with open(self.checkpoint_path(), "rb") as file:
+            header = json.loads(file.readline().decode("utf-8"))
+            state = io.BytesIO(file.read())
+
+        self.environment.pyboy.load_state(state)
+
+        self.frame = header["frame"]
+        self.segment = header["segment"]
+        self.prev_pos = header["prev_pos"]
+        self.jump_type = JumpType(header["jump_type"])
+        self.jump_count = header["jump_count"]
+        self.jump_size = header["jump_size"]
+        self.load_trace(header["trace_length"])
+
+    def trace_path(self):
+        return f"{self.results_path}/trace.part"
+
+    def flush_trace(self):
+        samples = np.asarray(self.trace[self.trace_flushed :], dtype=np.int32).reshape(-1, 2)
+        with open(self.trace_path(), "ab") as file:
+            file.write(samples.tobytes())
+            file.flush()
+            os.fsync(file.fileno())
+
+        self.trace_flushed = len(self.trace)
+
+    def load_trace(self, length):
+        """
+        Restores the first length samples from trace_path, dropping any appended after the checkpoint was taken.
+        """
+        with open(self.trace_path(), "r+b") as file:
+            samples = np.frombuffer(file.read(), dtype=np.int32).reshape(-1, 2)[:length]
+            file.truncate(samples.nbytes)
+
+        self.trace = [tuple(sample) for sample in samples.tolist()]
+        self.trace_flushed = len(self.trace)
+
+    def save_trace(self):
+        trace = np.asarray(self.trace, dtype=np.int32).reshape(-1, 2)
+        np.savez_compressed(
+            f"{self.results_path}/trace.npz", x_position=trace[:, 0], score=trace[:, 1]
+        )
+
+    def segment_path(self, segment):
+        if segment == 0:
+            return f"{self.results_path}/mario_expert.mp4"
+        return f"{self.results_path}/mario_expert_{segment:03d}.mp4"
+
+    def start_segment(self):
+        frame = self.environment.grab_frame()
+        height, width, _ = frame.shape
+
+        self.start_video(self.segment_path(self.segment), width, height)
+
     def start_video(self, video_name, width, height, fps=30):
         """
-        Do NOT edit this method.
+        Opens an mp4v writer for video_name. cv2 is imported here so runs without video never load it.
         """
+        import cv2
+
         self.video = cv2.VideoWriter(
             video_name, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height)
         )
 
     def stop_video(self) -> None:
         """
-        Do NOT edit this method.
+        Releases the current video writer, if any - safe to call when recording is disabled.
         """
-        self.video.release()
\ No newline at end of file
+        if self.video is not None:
+            self.video.release()
+            self.video = None
\ No newline at end of file
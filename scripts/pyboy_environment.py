@@ -1,7 +1,7 @@
+import io
 from abc import ABCMeta
 from pathlib import Path
 
-import cv2
 import numpy as np
 from pyboy import PyBoy
 
@@ -20,6 +20,7 @@ class PyboyEnvironment(metaclass=ABCMeta):
         init_name: str,
         emulation_speed: int = 0,
         headless: bool = False,
+        pyboy=None,
     ) -> None:
         self.task = task
 
@@ -28,19 +29,33 @@ class PyboyEnvironment(metaclass=ABCMeta):
         self.rom_path = f"{path}/{self.task}/{rom_name}"
         self.init_path = f"{path}/{self.task}/{init_name}"
 
-        head = "null" if headless else "SDL2"
-        self.pyboy = PyBoy(
-            self.rom_path,
-            window=head,
-        )
+        # An injected backend (e.g. fake_pyboy.FakePyBoy) is used as is - its current state becomes the start state
+        # that reset() returns to, so no ROM or init state file is needed
+        self.start_state = None
+        injected = pyboy is not None
+        if not injected:
+            head = "null" if headless else "SDL2"
+            pyboy = PyBoy(
+                self.rom_path,
+                window=head,
+            )
+
+        self.pyboy = pyboy
 
         self.screen = self.pyboy.screen
 
         self.pyboy.set_emulation_speed(emulation_speed)
 
+        if injected:
+            self.start_state = io.BytesIO()
+            self.pyboy.save_state(self.start_state)
+
         self.reset()
 
     def grab_frame(self, height: int = 240, width: int = 300) -> np.ndarray:
+        # Imported lazily so headless runs without video never pay for OpenCV
+        import cv2
+
         frame = np.array(self.screen.ndarray)
         frame = cv2.resize(frame, (width, height))
         # Convert to BGR for use with OpenCV
@@ -48,6 +63,11 @@ class PyboyEnvironment(metaclass=ABCMeta):
         return frame
 
     def reset(self) -> np.ndarray:
+        if self.start_state is not None:
+            self.start_state.seek(0)
+            self.pyboy.load_state(self.start_state)
+            return
+
         with open(self.init_path, "rb") as f:
             self.pyboy.load_state(f)
 
@@ -9,7 +9,7 @@ import logging
 import os
 from pathlib import Path
 
-from mario_expert import MarioExpert
+from mario_expert import DecisionCache, MarioExpert
 
 logging.basicConfig(level=logging.INFO)
 
@@ -19,12 +19,36 @@ def get_args():
 
     parse_args.add_argument("--headless", action="store_true")
 
+    parse_args.add_argument("--no_video", action="store_true")
+
+    parse_args.add_argument("--checkpoint_every", type=int, default=0)
+
+    parse_args.add_argument("--resume", action="store_true")
+
+    parse_args.add_argument("--record_trace", action="store_true")
+
+    parse_args.add_argument("--use_oam", action="store_true")
+
+    parse_args.add_argument("--decision_cache", action="store_true")
+
+    parse_args.add_argument("--verify_cache", action="store_true")
+
     parse_args.add_argument("--upi", type=str, required=True)
 
     return parse_args.parse_args()
 
 
-def run(upi, headless):
+def run(
+    upi,
+    headless,
+    record_video=True,
+    checkpoint_every=0,
+    resume=False,
+    record_trace=False,
+    use_oam=False,
+    decision_cache=False,
+    verify_cache=False,
+):
     if upi == "your_upi":
         raise ValueError("Please set your UPI in the run.py file")
 
@@ -35,13 +59,38 @@ def run(upi, headless):
         os.makedirs(results_path)
 
     expert = MarioExpert(results_path=results_path, headless=headless)
-    expert.play()
+    expert.record_video = record_video
+    expert.checkpoint_every = checkpoint_every
+    expert.environment.use_oam = use_oam
+
+    if decision_cache or verify_cache:
+        expert.decision_cache = DecisionCache(verify=verify_cache)
+
+    if record_trace:
+        from fake_pyboy import TraceRecorder
+
+        expert.environment.pyboy = TraceRecorder(expert.environment.pyboy)
+
+    expert.play(resume=resume)
+
+    if record_trace:
+        expert.environment.pyboy.save(f"{results_path}/ram_trace.npz")
 
 
 def main():
     args = get_args()
 
-    run(args.upi, args.headless)
+    run(
+        args.upi,
+        args.headless,
+        record_video=not args.no_video,
+        checkpoint_every=args.checkpoint_every,
+        resume=args.resume,
+        record_trace=args.record_trace,
+        use_oam=args.use_oam,
+        decision_cache=args.decision_cache,
+        verify_cache=args.verify_cache,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,178 @@
+"""
+Post-run stage for evaluating many submissions.
+
+Appends a shard with the summaries of any new or re-run submissions in the results folder to the columnar summary
+store, compacts the store once it holds more than --max_shards shards (or on --compact), then applies the video
+retention policy: the top ranked runs keep their full videos while the rest are thinned
+(half resolution, every other frame) or deleted on a pool of background workers.
+
+    python3 summarise_results.py -r ../results -s ../summary --keep_top 10
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from summary_store import STAT_COLUMNS, compact, downsample, load_summary, rank, shard_paths, write_shard
+
+logging.basicConfig(level=logging.INFO)
+
+THIN_VIDEO_NAME = "mario_expert_thin.mp4"
+
+
+def get_args():
+    parse_args = argparse.ArgumentParser()
+
+    parse_args.add_argument("-r", "--results_path", type=str, required=True)
+
+    parse_args.add_argument("-s", "--summary_path", type=str, required=True)
+
+    parse_args.add_argument("--compact", action="store_true")
+
+    parse_args.add_argument("--max_shards", type=int, default=16)
+
+    parse_args.add_argument("--keep_top", type=int, default=10)
+
+    parse_args.add_argument("--video_policy", choices=["keep", "thin", "delete"], default="thin")
+
+    parse_args.add_argument("--workers", type=int, default=os.cpu_count())
+
+    return parse_args.parse_args()
+
+
+def summarise(result_directories):
+    columns = {name: [] for name in ["upi", "mtime", "frames", "x_curve", "score_curve"] + STAT_COLUMNS}
+
+    for result_directory in result_directories:
+        upi = os.path.basename(result_directory)
+
+        with open(f"{result_directory}/results.json", "r", encoding="utf-8") as file:
+            result = json.load(file)
+
+        x_position, score = np.zeros(0), np.zeros(0)
+        if os.path.exists(f"{result_directory}/trace.npz"):
+            with np.load(f"{result_directory}/trace.npz") as trace:
+                x_position, score = trace["x_position"], trace["score"]
+
+        columns["upi"].append(upi)
+        columns["mtime"].append(os.path.getmtime(f"{result_directory}/results.json"))
+        columns["frames"].append(len(x_position))
+        columns["x_curve"].append(downsample(x_position))
+        columns["score_curve"].append(downsample(score))
+        for name in STAT_COLUMNS:
+            columns[name].append(result[name])
+
+    return {
+        name: np.asarray(values, dtype=None if name in ["upi", "mtime", "x_curve", "score_curve"] else np.int32)
+        for name, values in columns.items()
+    }
+
+
+def video_segments(result_directory):
+    return sorted(
+        path
+        for path in glob.glob(f"{result_directory}/mario_expert*.mp4")
+        if not path.endswith(THIN_VIDEO_NAME)
+    )
+
+
+def thin_videos(result_directory, step=2, scale=0.5):
+    """
+    Re-encodes every video segment of a run into a single smaller video and removes the originals.
+    """
+    import cv2
+
+    segments = video_segments(result_directory)
+
+    writer = None
+    for segment in segments:
+        capture = cv2.VideoCapture(segment)
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30
+
+        index = 0
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+
+            if index % step == 0:
+                frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+                if writer is None:
+                    height, width, _ = frame.shape
+                    writer = cv2.VideoWriter(
+                        f"{result_directory}/{THIN_VIDEO_NAME}",
+                        cv2.VideoWriter_fourcc(*"mp4v"),
+                        fps / step,
+                        (width, height),
+                    )
+                writer.write(frame)
+            index += 1
+
+        capture.release()
+
+    if writer is not None:
+        writer.release()
+
+    for segment in segments:
+        os.remove(segment)
+
+    return result_directory
+
+
+def delete_videos(result_directory):
+    for path in glob.glob(f"{result_directory}/mario_expert*.mp4"):
+        os.remove(path)
+
+    return result_directory
+
+
+def main():
+    args = get_args()
+
+    summary = load_summary(args.summary_path)
+    summarised = dict(zip(summary["upi"], summary["mtime"])) if summary else {}
+
+    # New runs, and re-runs whose results.json is newer than their summary row
+    result_directories = [
+        path
+        for path in sorted(glob.glob(f"{args.results_path}/*"))
+        if os.path.exists(f"{path}/results.json")
+        and os.path.getmtime(f"{path}/results.json") > summarised.get(os.path.basename(path), -np.inf)
+    ]
+    logging.info(f"Found {len(result_directories)} new or updated results directories")
+
+    if result_directories:
+        path = write_shard(args.summary_path, summarise(result_directories))
+        logging.info(f"Wrote summary shard: {path}")
+        summary = load_summary(args.summary_path)
+
+    if args.compact or len(shard_paths(args.summary_path)) > args.max_shards:
+        path = compact(args.summary_path)
+        if path is not None:
+            logging.info(f"Compacted summary store into: {path}")
+
+    if not summary or args.video_policy == "keep":
+        return
+
+    retire = summary["upi"][rank(summary)[args.keep_top :]]
+    pending = [
+        f"{args.results_path}/{upi}"
+        for upi in retire
+        if video_segments(f"{args.results_path}/{upi}")
+        or (args.video_policy == "delete" and os.path.exists(f"{args.results_path}/{upi}/{THIN_VIDEO_NAME}"))
+    ]
+    logging.info(f"Applying video policy '{args.video_policy}' to {len(pending)} runs")
+
+    worker = thin_videos if args.video_policy == "thin" else delete_videos
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for result_directory in pool.map(worker, pending):
+            logging.info(f"Processed videos for: {result_directory}")
+
+
+if __name__ == "__main__":
+    main()
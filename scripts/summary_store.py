@@ -0,0 +1,103 @@
+"""
+Columnar store for per-run summaries.
+
+Each shard is a compressed NumPy .npz file holding one array per column, with one row per run. Scalar stats
+from results.json become 1-D columns and the per-frame x_position/score curves are downsampled to a fixed
+number of points so every row has the same width. A upi can appear in several shards when a submission is
+re-run - the row with the newest results.json mtime wins, and compact folds the store back into one shard.
+"""
+
+import glob
+import os
+import tempfile
+import time
+import uuid
+
+import numpy as np
+
+STAT_COLUMNS = ["lives", "score", "coins", "stage", "world", "x_position", "time"]
+CURVE_POINTS = 256
+
+
+def downsample(curve, points=CURVE_POINTS):
+    curve = np.asarray(curve, dtype=np.float32)
+    if len(curve) == 0:
+        return np.zeros(points, dtype=np.float32)
+    positions = np.linspace(0, len(curve) - 1, points)
+    return np.interp(positions, np.arange(len(curve)), curve).astype(np.float32)
+
+
+def shard_paths(summary_path):
+    return sorted(glob.glob(f"{summary_path}/shard-*.npz"))
+
+
+def write_shard(summary_path, columns):
+    """
+    Writes columns as a new shard in summary_path and returns its path.
+
+    Shards are named by creation time plus a random suffix so concurrent writers never pick the same name. Each is
+    written to a unique temporary file and moved into place so readers never see a partial file.
+    """
+    os.makedirs(summary_path, exist_ok=True)
+
+    path = f"{summary_path}/shard-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.npz"
+    fd, tmp_path = tempfile.mkstemp(prefix=".shard-", suffix=".npz", dir=summary_path)
+    with os.fdopen(fd, "wb") as file:
+        np.savez_compressed(file, **columns)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_summary(summary_path, paths=None):
+    """
+    Loads every shard in summary_path (or just paths) and concatenates them column by column, keeping the newest
+    row per upi.
+    """
+    if paths is None:
+        paths = shard_paths(summary_path)
+
+    shards = []
+    for path in paths:
+        with np.load(path) as shard:
+            shards.append({name: shard[name] for name in shard.files})
+
+    if not shards:
+        return {}
+
+    summary = {name: np.concatenate([shard[name] for shard in shards]) for name in shards[0]}
+
+    # Sort by upi then mtime and keep the last row of each upi
+    order = np.lexsort((summary["mtime"], summary["upi"]))
+    upi = summary["upi"][order]
+    newest = order[np.r_[upi[1:] != upi[:-1], True]]
+
+    return {name: column[newest] for name, column in summary.items()}
+
+
+def compact(summary_path):
+    """
+    Rewrites the newest row per upi from every current shard into a single shard and removes the shards it replaces.
+
+    Returns the path of the new shard, or None if there was nothing to compact. Shards written while compacting
+    are left alone, and rows duplicated by a concurrent compaction are resolved by load_summary.
+    """
+    paths = shard_paths(summary_path)
+    if len(paths) <= 1:
+        return None
+
+    path = write_shard(summary_path, load_summary(summary_path, paths))
+
+    for old_path in paths:
+        try:
+            os.remove(old_path)
+        except FileNotFoundError:
+            pass
+
+    return path
+
+
+def rank(summary):
+    """
+    Returns row indices ordered best first - by world, then stage, then score, matching compare_performance.
+    """
+    return np.lexsort((-summary["score"], -summary["stage"], -summary["world"]))
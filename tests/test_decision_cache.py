@@ -0,0 +1,115 @@
+import numpy as np
+
+from fake_pyboy import FakePyBoy, blank_trace, poke
+from mario_expert import DecisionCache, JumpType, MarioController, MarioExpert
+
+OBJECT_TABLE_START = 0xD100
+
+
+def make_expert(trace, results_path, decision_cache=None):
+    environment = MarioController(pyboy=FakePyBoy(trace))
+    expert = MarioExpert.from_environment(str(results_path), environment)
+    expert.decision_cache = decision_cache
+    return expert
+
+
+def airborne_enemy_trace(enemy_dy):
+    """
+    One frame with Mario falling at (100, 100) and a Nokobon 10 px ahead of him and enemy_dy px below.
+    """
+    trace = blank_trace(2)
+    poke(trace, 0xC201, [100, 100])
+    poke(trace, 0xC207, 0x02)  # falling
+    poke(trace, OBJECT_TABLE_START, 0x04)
+    poke(trace, OBJECT_TABLE_START + 2, [100 + enemy_dy, 110])
+    trace["game_area"][:, 14:, :] = 10
+    return trace
+
+
+def random_trace(frames, seed=0):
+    """
+    Random frames built from a small pool of situations, so the same observation comes up many times.
+    """
+    rng = np.random.default_rng(seed)
+    trace = blank_trace(frames)
+
+    for frame, situation in enumerate(rng.integers(0, 40, size=frames)):
+        pick = np.random.default_rng(int(situation))
+        poke(trace, 0xC201, [100, 100], frames=frame)
+        poke(trace, 0xC20A, pick.integers(0, 2), frames=frame)
+        poke(trace, 0xC207, 2 * pick.integers(0, 2), frames=frame)
+        poke(trace, 0xC0AB, pick.integers(0, 3), frames=frame)
+        poke(trace, OBJECT_TABLE_START, pick.choice([0x01, 0x04]), frames=frame)
+        poke(trace, OBJECT_TABLE_START + 2, pick.integers(40, 160, size=2), frames=frame)
+        trace["game_area"][frame] = pick.choice([0, 10, 18], size=trace["game_area"].shape[1:], p=[0.6, 0.3, 0.1])
+
+    return trace
+
+
+def test_lru_eviction_and_move_to_end():
+    cache = DecisionCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    assert cache.get("a") == 1  # a becomes the most recently used
+    cache.put("c", 3)
+
+    assert list(cache.entries) == ["a", "c"]
+    assert cache.get("b") is None
+
+
+def test_hit_rate_and_stats():
+    cache = DecisionCache()
+    assert cache.hit_rate == 0.0
+
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+
+    assert cache.hit_rate == 2 / 3
+    assert cache.stats() == {"size": 1, "hits": 2, "misses": 1, "hit_rate": 2 / 3, "mismatches": 0}
+
+
+def test_verify_counts_mismatches_from_coarse_buckets(tmp_path):
+    # Both enemies fall in the same 200 px bucket, but only the first is in ENEMY_ABOVE_RECT
+    cache = DecisionCache(bucket=200, verify=True)
+
+    above = make_expert(airborne_enemy_trace(0), tmp_path, cache)
+    below = make_expert(airborne_enemy_trace(-50), tmp_path, cache)
+
+    assert above.choose_action() != below.choose_action()
+    assert cache.hits == 1
+    assert cache.mismatches == 1
+
+
+def test_coarse_buckets_without_verify_return_the_cached_action(tmp_path):
+    cache = DecisionCache(bucket=200)
+
+    above = make_expert(airborne_enemy_trace(0), tmp_path, cache)
+    below = make_expert(airborne_enemy_trace(-50), tmp_path, cache)
+
+    assert above.choose_action() == below.choose_action()
+    assert cache.mismatches == 0
+
+
+def test_cached_decisions_match_fresh_evaluation(tmp_path):
+    trace = random_trace(2000)
+    cache = DecisionCache()
+
+    fresh = make_expert(trace, tmp_path)
+    cached = make_expert(trace, tmp_path, cache)
+
+    jump_types = set()
+    for _ in range(len(trace["ram"]) - 1):
+        decisions = []
+        for expert in [fresh, cached]:
+            action = expert.choose_action()
+            expert.environment.run_action(action, expert.jump_type)
+            decisions.append((action, expert.jump_type, expert.jump_size, expert.jump_count))
+
+        assert decisions[0] == decisions[1]
+        jump_types.add(decisions[0][1])
+
+    assert cache.hits > 0
+    assert len(jump_types) > 1
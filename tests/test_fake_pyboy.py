@@ -0,0 +1,156 @@
+import io
+import json
+
+import numpy as np
+from pyboy.utils import WindowEvent
+
+from fake_pyboy import FakePyBoy, TraceRecorder, blank_trace, poke
+from mario_expert import MarioController, MarioExpert
+
+
+def flat_ground_trace(frames):
+    trace = blank_trace(frames)
+    poke(trace, 0xC201, [100, 100])  # Mario's y, x - away from the empty object table slots at (0, 0)
+    poke(trace, 0xC20A, 0x01)  # on the ground
+    trace["game_area"][:, 14:, :] = 10  # solid floor, so no gap ahead
+    return trace
+
+
+def make_expert(trace, results_path):
+    environment = MarioController(pyboy=FakePyBoy(trace))
+    expert = MarioExpert.from_environment(str(results_path), environment)
+    expert.record_video = False
+    return expert
+
+
+def test_memory_reads_current_frame():
+    trace = blank_trace(3)
+    poke(trace, 0xC202, [10, 11, 12], frames=0)
+    poke(trace, 0xC202, 20, frames=1)
+
+    pyboy = FakePyBoy(trace)
+    assert pyboy.memory[0xC202] == 10
+    assert pyboy.memory[0xC202:0xC205] == [10, 11, 12]
+    assert pyboy.memory[0x8000] == 0
+
+    assert pyboy.tick()
+    assert pyboy.memory[0xC202] == 20
+    assert pyboy.tick()
+    assert not pyboy.tick()
+    assert pyboy.frame == 2
+
+
+def test_choose_action_replays_without_rom(tmp_path):
+    expert = make_expert(flat_ground_trace(5), tmp_path)
+    action = expert.choose_action()
+
+    assert expert.environment.valid_actions[action] == WindowEvent.PRESS_ARROW_RIGHT
+
+
+def test_play_stops_when_trace_runs_out(tmp_path):
+    expert = make_expert(flat_ground_trace(10), tmp_path)
+    expert.play()
+
+    # Nine steps use up the trace and the tenth finds nothing left to tick
+    assert expert.frame == 10
+    assert expert.environment.pyboy.frame == 9
+    assert not expert.environment.running
+    with open(tmp_path / "results.json", encoding="utf-8") as file:
+        assert json.load(file)["game_over"] is False
+
+
+def test_play_resets_to_injected_start_state(tmp_path):
+    trace = blank_trace(4)
+    pyboy = FakePyBoy(trace)
+    pyboy.tick()
+
+    environment = MarioController(pyboy=pyboy)
+    assert pyboy.frame == 1
+
+    pyboy.tick()
+    environment.reset()
+    assert pyboy.frame == 1
+
+
+def test_resume_restores_trace_from_checkpoint(tmp_path):
+    trace = flat_ground_trace(10)
+
+    expert = make_expert(trace, tmp_path)
+    expert.environment.reset()
+    for _ in range(4):
+        expert.step()
+        expert.frame += 1
+        expert.trace.append((expert.frame, 0))
+    expert.save_checkpoint()
+
+    # Samples flushed by a later, interrupted checkpoint must not leak into the resumed run
+    expert.trace.append((99, 99))
+    expert.flush_trace()
+
+    resumed = make_expert(trace, tmp_path)
+    resumed.play(resume=True)
+
+    assert resumed.trace[:4] == [(1, 0), (2, 0), (3, 0), (4, 0)]
+    assert (99, 99) not in resumed.trace
+    assert not (tmp_path / "checkpoint.state").exists()
+    assert not (tmp_path / "trace.part").exists()
+
+
+def test_second_play_starts_a_fresh_run(tmp_path):
+    trace = flat_ground_trace(20)
+    poke(trace, 0xC0A4, 0x39, frames=slice(15, None))  # game over from frame 15
+
+    expert = make_expert(trace, tmp_path)
+    expert.checkpoint_every = 4
+
+    for _ in range(2):
+        expert.play()
+
+        assert expert.frame == 15
+        assert expert.segment == 3
+        assert len(expert.trace) == 15
+        with np.load(tmp_path / "trace.npz") as saved:
+            assert len(saved["x_position"]) == 15
+
+
+def test_tick_advances_count_frames():
+    pyboy = FakePyBoy(blank_trace(6))
+
+    assert pyboy.tick(3)
+    assert pyboy.frame == 3
+    assert not pyboy.tick(3)
+    assert pyboy.frame == 5
+
+
+class CountingPyBoy:
+    """
+    Minimal real-PyBoy lookalike whose only state is the frame counter, stored in work RAM.
+    """
+
+    def __init__(self, trace):
+        self.fake = FakePyBoy(trace)
+        self.memory = self.fake.memory
+        self.screen = self.fake.screen
+        self.game_wrapper = self.fake.game_wrapper
+
+    def load_state(self, file):
+        self.fake.load_state(file)
+
+    def tick(self, count=1, render=True):
+        return self.fake.tick(count, render)
+
+
+def test_recorder_captures_every_frame_of_a_multi_frame_tick():
+    trace = blank_trace(4)
+    for frame in range(4):
+        poke(trace, 0xC000, frame, frames=frame)
+
+    recorder = TraceRecorder(CountingPyBoy(trace))
+    recorder.load_state(io.BytesIO())  # rewinds to the first frame and starts a new trace
+    assert recorder.tick(3)
+
+    recorded = FakePyBoy({**trace, "ram": np.stack([frame["ram"] for frame in recorder.frames])})
+    assert len(recorded) == 4
+    for frame in range(4):
+        assert recorded.memory[0xC000] == frame
+        recorded.tick()
@@ -0,0 +1,108 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from fake_pyboy import FakePyBoy, blank_trace, poke
+from mario_expert import ENEMY_RECT, MARIO_FAMILY, SPRITE_FAMILY, MarioController
+
+GOOMBA = 144
+KOOPA = 150
+MUSHROOM = 131
+
+
+def make_controller(sprites, mario=(50, 108)):
+    """
+    Builds a controller over a single frame holding the given (x, y, tile) sprites, with Mario's RAM position at mario.
+    """
+    trace = blank_trace(1)
+    poke(trace, 0xC201, [mario[1], mario[0]])
+    for index, (x, y, tile) in enumerate(sprites):
+        poke(trace, MarioController.OAM_START + 4 * index, [y, x, tile, 0])
+
+    return MarioController(pyboy=FakePyBoy(trace), use_oam=True)
+
+
+def block(x, y, tile):
+    return [(x, y, tile), (x + 8, y, tile), (x, y + 8, tile), (x + 8, y + 8, tile)]
+
+
+MARIO = [(50, 100, 0), (58, 100, 1), (50, 108, 2), (58, 108, 3)]
+
+
+def test_enemy_touching_mario_is_kept():
+    controller = make_controller(MARIO + block(66, 100, GOOMBA))
+
+    assert controller.get_entities().tolist() == [[66, 100, GOOMBA, SPRITE_FAMILY[GOOMBA]]]
+    assert controller.get_enemy_offsets() == [(16, 8)]
+    assert len(controller.get_entities(include_mario=True)) == 2
+    assert controller.is_enemy_near(ENEMY_RECT)
+
+
+def test_entities_are_moved_into_find_mario_space():
+    # Mario's RAM position sits 10 px right of and 12 px below the anchor of his sprites
+    controller = make_controller(MARIO + block(66, 100, GOOMBA), mario=(60, 120))
+
+    assert controller.get_mario_oam_anchor() == (50, 108)
+    assert controller.get_entities()[:, :2].tolist() == [[76, 112]]
+    assert controller.get_enemy_offsets() == [(16, 8)]
+
+
+def test_fixed_offset_is_used_without_mario_sprites(monkeypatch):
+    monkeypatch.setattr(MarioController, "MARIO_OAM_OFFSET", (-8, 4))
+    controller = make_controller(block(66, 100, GOOMBA))
+
+    assert controller.get_mario_oam_anchor() is None
+    assert controller.get_entities()[:, :2].tolist() == [[58, 104]]
+
+
+def test_adjacent_enemies_of_different_families_stay_apart():
+    controller = make_controller(block(90, 100, GOOMBA) + block(106, 100, KOOPA))
+
+    entities = controller.get_entities()
+    assert sorted(entities[:, 2].tolist()) == [GOOMBA, KOOPA]
+
+
+def test_power_ups_are_not_enemies():
+    controller = make_controller(MARIO + block(66, 100, MUSHROOM))
+
+    assert controller.get_entities()[:, 2].tolist() == [MUSHROOM]
+    assert len(controller.get_entities(enemies_only=True)) == 0
+    assert not controller.is_enemy_near(ENEMY_RECT)
+    assert controller.get_enemy_offsets() == []
+
+
+FIXTURE = Path(__file__).parent / "fixtures" / "ram_trace.npz"
+
+
+def recorded_traces():
+    if "MARIO_TRACE" in os.environ:
+        return [os.environ["MARIO_TRACE"]]
+    return [str(FIXTURE)] if FIXTURE.exists() else []
+
+
+@pytest.mark.skipif(
+    not recorded_traces(),
+    reason="needs tests/fixtures/ram_trace.npz - record one with run.py --record_trace (needs the ROM)",
+)
+def test_mario_oam_offset_matches_recording():
+    """
+    find_mario minus the anchor of Mario's sprites must be MARIO_OAM_OFFSET (to 1 px) on every recorded frame.
+    """
+    for path in recorded_traces():
+        pyboy = FakePyBoy(path)
+        controller = MarioController(pyboy=pyboy)
+
+        offsets = []
+        for _ in range(len(pyboy)):
+            anchor = controller.get_mario_oam_anchor()
+            if anchor is not None:
+                mario_x, mario_y = controller.find_mario()
+                offsets.append((mario_x - anchor[0], mario_y - anchor[1]))
+            pyboy.tick()
+
+        offsets = np.asarray(offsets)
+        assert len(offsets) > 0
+        measured = np.median(offsets, axis=0).tolist()
+        assert np.abs(offsets - MarioController.MARIO_OAM_OFFSET).max() <= 1, f"measured offset {measured}"
@@ -0,0 +1,60 @@
+import json
+import os
+
+import numpy as np
+
+import summarise_results
+from summary_store import compact, load_summary, rank, shard_paths, write_shard
+
+
+def write_result(results_path, upi, score, mtime):
+    os.makedirs(results_path / upi, exist_ok=True)
+    result = {"lives": 0, "score": score, "coins": 0, "stage": 1, "world": 1, "x_position": 0, "time": 0}
+    with open(results_path / upi / "results.json", "w", encoding="utf-8") as file:
+        json.dump(result, file)
+    os.utime(results_path / upi / "results.json", (mtime, mtime))
+
+
+def test_newest_row_per_upi_wins(tmp_path):
+    results_path = tmp_path / "results"
+    write_result(results_path, "abc123", 100, 1000)
+    write_result(results_path, "def456", 200, 1000)
+    write_shard(tmp_path / "summary", summarise_results.summarise(sorted(map(str, results_path.iterdir()))))
+
+    write_result(results_path, "abc123", 300, 2000)
+    write_shard(tmp_path / "summary", summarise_results.summarise([str(results_path / "abc123")]))
+
+    summary = load_summary(tmp_path / "summary")
+    assert summary["upi"][rank(summary)].tolist() == ["abc123", "def456"]
+    assert summary["score"][rank(summary)].tolist() == [300, 200]
+
+
+def test_shard_names_do_not_collide(tmp_path):
+    columns = {"upi": np.asarray(["abc123"]), "mtime": np.asarray([0.0])}
+
+    paths = {write_shard(tmp_path, columns) for _ in range(5)}
+
+    assert len(paths) == 5
+    assert len(shard_paths(tmp_path)) == 5
+
+
+def test_compact_keeps_newest_rows_in_one_shard(tmp_path):
+    results_path = tmp_path / "results"
+    summary_path = tmp_path / "summary"
+    for mtime, score in [(1000, 100), (2000, 300), (3000, 200)]:
+        write_result(results_path, "abc123", score, mtime)
+        write_shard(summary_path, summarise_results.summarise([str(results_path / "abc123")]))
+    write_result(results_path, "def456", 50, 1000)
+    write_shard(summary_path, summarise_results.summarise([str(results_path / "def456")]))
+
+    before = load_summary(summary_path)
+    path = compact(summary_path)
+
+    assert shard_paths(summary_path) == [path]
+    after = load_summary(summary_path)
+    assert after["upi"].tolist() == before["upi"].tolist() == ["abc123", "def456"]
+    assert after["score"].tolist() == [200, 50]
+    with np.load(path) as shard:
+        assert len(shard["upi"]) == 2
+
+    assert compact(summary_path) is None